@@ -1,3 +1,4 @@
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -65,13 +66,72 @@ WSGI_APPLICATION = 'config.wsgi.application'
 
 
 # Database config
+#
+# The profile is picked from the environment so the same settings file serves
+# local dev (SQLite) and production (PostgreSQL):
+#   DB_ENGINE        sqlite | postgres (default: sqlite)
+#   DB_CONN_MAX_AGE  seconds a connection is reused across requests, 0 closes
+#                    it after every request, -1 keeps it forever (default: 60)
+#   DB_BUSY_TIMEOUT  ms SQLite waits on a locked database before raising
+#                    "database is locked" (default: 5000)
+
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', '60'))
+DB_BUSY_TIMEOUT = int(os.environ.get('DB_BUSY_TIMEOUT', '5000'))
+
+if DB_ENGINE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'event_booking'),
+            'USER': os.environ.get('DB_USER', 'postgres'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            'CONN_MAX_AGE': None if DB_CONN_MAX_AGE < 0 else DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            # pgbouncer in transaction mode can't hold server-side cursors
+            'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('DB_PGBOUNCER') == '1',
+            'OPTIONS': {
+                'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', '5')),
+            },
+        }
+    }
+else:
+    # config.sqlite3 is the stock backend plus WAL journaling, busy_timeout and
+    # synchronous=NORMAL on connect, and BEGIN IMMEDIATE for atomic blocks
+    DATABASES = {
+        'default': {
+            'ENGINE': 'config.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': None if DB_CONN_MAX_AGE < 0 else DB_CONN_MAX_AGE,
+            'OPTIONS': {
+                'timeout': DB_BUSY_TIMEOUT / 1000,
+            },
+        }
+    }
+
+
+# Cache config
+#
+# Feed change versions, booking throttles and idempotency keys live here, so
+# every worker process must share one cache in production: set REDIS_URL
+# (needs the redis package). Without it each process keeps its own in-memory
+# cache, which is fine for local dev.
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
     }
-}
 
 
 # password validation
@@ -118,8 +178,19 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # token buckets for book/unbook: burst size / refill period
+    'DEFAULT_THROTTLE_RATES': {
+        'booking_user': '20/min',
+        'booking_slot': '60/min',
+    },
 }
 
+# seconds a stored response is replayed for a repeated Idempotency-Key
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+# seconds a key stays "in progress" (409 to repeats) if its first request
+# never finishes, e.g. because the worker was killed
+IDEMPOTENCY_LOCK_TTL = 30
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
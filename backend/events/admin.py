@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import EventCategory, TimeSlot, UserPreference
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedTimeSlot, EventCategory, OutboxJob, SlotAvailability, TimeSlot, UserPreference
 
 
 @admin.register(EventCategory)
@@ -12,7 +15,62 @@ class TimeSlotAdmin(admin.ModelAdmin):
     list_display = ("id", "title", "category", "start_time", "end_time", "booked_by")
     list_filter = ("category",)
 
+    # Admin edits bypass the API views, so recount the availability rows of
+    # every day/category a change touched.
+
+    def save_model(self, request, obj, form, change):
+        days = set()
+        if change:
+            days |= _summary_days(TimeSlot.objects.filter(pk=obj.pk))
+        super().save_model(request, obj, form, change)
+        _recount(days | _summary_days([obj]))
+
+    def delete_model(self, request, obj):
+        days = _summary_days([obj])
+        super().delete_model(request, obj)
+        _recount(days)
+
+    @transaction.atomic
+    def delete_queryset(self, request, queryset):
+        days = _summary_days(queryset)
+        super().delete_queryset(request, queryset)
+        _recount(days)
+
+
+@admin.register(ArchivedTimeSlot)
+class ArchivedTimeSlotAdmin(admin.ModelAdmin):
+    list_display = ("id", "title", "category", "start_time", "end_time", "booked_by", "archived_at")
+    list_filter = ("category",)
+    date_hierarchy = "start_time"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
 
 @admin.register(UserPreference)
 class UserPreferenceAdmin(admin.ModelAdmin):
     list_display = ("user",)
+
+
+@admin.register(SlotAvailability)
+class SlotAvailabilityAdmin(admin.ModelAdmin):
+    list_display = ("date", "category", "free_count", "booked_count")
+    list_filter = ("category",)
+
+
+@admin.register(OutboxJob)
+class OutboxJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "topic", "handler", "status", "attempts", "available_at", "created_at")
+    list_filter = ("status", "topic")
+
+
+def _summary_days(slots):
+    return {(timezone.localdate(slot.start_time), slot.category_id) for slot in slots}
+
+
+def _recount(days):
+    for day, category_id in days:
+        SlotAvailability.recount(day, category_id)
@@ -0,0 +1,227 @@
+"""iCalendar feeds of a user's bookings and preferred categories.
+
+Calendar apps poll feeds often, so nothing is rebuilt unless it changed.
+Each user's bookings and each category carry a change version in the cache,
+bumped (after commit) whenever a slot in them is created, booked or
+unbooked. Rendered VEVENT blocks are cached under their version, so a poll
+costs a few cache reads, and a preference feed only re-renders the
+categories that actually changed. The versions are also timestamps, which
+the views use for ETag and Last-Modified.
+"""
+
+import hashlib
+import math
+import secrets
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core import signing
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import TimeSlot, UserPreference
+
+# How far back feeds reach; older slots drop out of the calendar
+FEED_HISTORY_DAYS = 30
+
+_SIGNER_SALT = "events.feeds"
+
+
+# tokens
+
+def make_token(user, rotate=False):
+    """Return the feed token embedded in a user's subscription URLs.
+
+    The token signs the user id together with a per-user secret. Passing
+    ``rotate=True`` replaces the secret, which revokes every URL issued
+    before.
+    """
+    pref, _ = UserPreference.objects.get_or_create(user=user)
+    if rotate or not pref.feed_secret:
+        pref.feed_secret = secrets.token_urlsafe(32)
+        pref.save(update_fields=["feed_secret"])
+    return signing.Signer(salt=_SIGNER_SALT).sign(f"{user.pk}:{pref.feed_secret}")
+
+
+def user_id_from_token(token):
+    """Return the user id of a valid, unrevoked *token*, or None."""
+    try:
+        user_id, secret = signing.Signer(salt=_SIGNER_SALT).unsign(token).split(":", 1)
+        user_id = int(user_id)
+    except (signing.BadSignature, ValueError):
+        return None
+    if not secret or not UserPreference.objects.filter(
+        user_id=user_id, feed_secret=secret
+    ).exists():
+        return None
+    return user_id
+
+
+# change versions
+
+def _user_key(user_id):
+    return f"feeds:version:user:{user_id}"
+
+
+def _category_key(category_id):
+    return f"feeds:version:category:{category_id}"
+
+
+def touch(slot, *user_ids):
+    """Invalidate the feeds showing *slot* once the transaction commits.
+
+    Pass the ids of users whose bookings changed (the booker or unbooker).
+    """
+    keys = [_category_key(slot.category_id)] + [_user_key(uid) for uid in user_ids]
+    transaction.on_commit(lambda: cache.set_many(dict.fromkeys(keys, time.time()), None))
+
+
+def _versions(keys):
+    """Return {key: version}, starting unknown keys at the current time."""
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        now = time.time()
+        for key in missing:
+            cache.add(key, now, None)
+        versions.update(cache.get_many(missing))
+    return versions
+
+
+def user_version(user_id):
+    return _versions([_user_key(user_id)])[_user_key(user_id)]
+
+
+def category_versions(category_ids):
+    """Return {category id: version} for *category_ids*."""
+    keys = {_category_key(cid): cid for cid in category_ids}
+    return {keys[key]: version for key, version in _versions(list(keys)).items()}
+
+
+def etag_for(*versions):
+    """ETag for a feed built from *versions*.
+
+    The feed window is part of it, as it is of the body cache keys, so the
+    ETag changes at midnight when old slots drop out.
+    """
+    key = (f"{_since():%Y%m%d}",) + versions
+    return hashlib.md5(repr(key).encode()).hexdigest()
+
+
+def last_modified(*versions):
+    """Last-Modified for a feed built from *versions*.
+
+    Rounded up to the next whole second, since HTTP dates have no fractions.
+    Truncating would hide a change made in the same second as a client's
+    last poll. It is never earlier than the last midnight, when the feed
+    window moved.
+    """
+    window_moved = _since() + timedelta(days=FEED_HISTORY_DAYS)
+    seconds = max(math.ceil(max(versions, default=0)), window_moved.timestamp())
+    return datetime.fromtimestamp(seconds, tz=dt_timezone.utc)
+
+
+# rendering
+
+def bookings_calendar(user_id):
+    """Return the .ics body for the slots booked by *user_id*."""
+    version = user_version(user_id)
+    key = f"feeds:ics:user:{user_id}:{version}:{_since():%Y%m%d}"
+    events = cache.get(key)
+    if events is None:
+        slots = TimeSlot.objects.filter(
+            booked_by_id=user_id, start_time__gte=_since()
+        ).select_related("category")
+        events = _render_events(slots)
+        cache.set(key, events)
+    return _calendar("My bookings", [events])
+
+
+def categories_calendar(versions):
+    """Return the .ics body for the categories in *versions*.
+
+    Only categories whose cached block is missing (because their version
+    moved) are queried and rendered again.
+    """
+    since = f"{_since():%Y%m%d}"
+    keys = {
+        f"feeds:ics:category:{cid}:{version}:{since}": cid
+        for cid, version in versions.items()
+    }
+    blocks = cache.get_many(list(keys))
+    missing = {keys[key]: key for key in keys if key not in blocks}
+    if missing:
+        slots = TimeSlot.objects.filter(
+            category_id__in=list(missing), start_time__gte=_since()
+        ).order_by("category_id", "start_time")
+        by_category = {cid: [] for cid in missing}
+        for slot in slots.select_related("category"):
+            by_category[slot.category_id].append(slot)
+        rendered = {missing[cid]: _render_events(s) for cid, s in by_category.items()}
+        cache.set_many(rendered)
+        blocks.update(rendered)
+    return _calendar("Event slots", [blocks[key] for key in sorted(keys)])
+
+
+def _since():
+    today = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+    return today - timedelta(days=FEED_HISTORY_DAYS)
+
+
+def _calendar(name, blocks):
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//Event Booking//Feeds//EN",
+        "CALSCALE:GREGORIAN",
+        _fold(f"X-WR-CALNAME:{_escape(name)}"),
+    ]
+    head = "\r\n".join(lines) + "\r\n"
+    return head + "".join(blocks) + "END:VCALENDAR\r\n"
+
+
+def _render_events(slots):
+    """Render *slots* as CRLF-terminated VEVENT lines."""
+    stamp = _format_dt(timezone.now())
+    out = []
+    for slot in slots:
+        status = "Booked" if slot.booked_by_id else "Available"
+        lines = [
+            "BEGIN:VEVENT",
+            f"UID:timeslot-{slot.pk}@event-booking",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART:{_format_dt(slot.start_time)}",
+            f"DTEND:{_format_dt(slot.end_time)}",
+            f"SUMMARY:{_escape(slot.title)}",
+            f"CATEGORIES:{_escape(slot.category.name)}",
+            f"DESCRIPTION:{status}",
+            "END:VEVENT",
+        ]
+        out.extend(_fold(line) + "\r\n" for line in lines)
+    return "".join(out)
+
+
+def _format_dt(value):
+    return value.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _escape(text):
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line, limit=75):
+    """Fold a content line at *limit* characters (RFC 5545, section 3.1)."""
+    if len(line) <= limit:
+        return line
+    parts = [line[:limit]]
+    line = line[limit:]
+    while line:
+        parts.append(" " + line[: limit - 1])
+        line = line[limit - 1:]
+    return "\r\n".join(parts)
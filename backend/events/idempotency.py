@@ -0,0 +1,87 @@
+"""``Idempotency-Key`` support for the booking endpoints.
+
+A client that retries a POST with the same Idempotency-Key header gets the
+stored response back, without another transaction or row lock on the slot.
+Responses are kept in the Django cache for IDEMPOTENCY_KEY_TTL seconds,
+scoped to the user and the request path. While the first request runs, the
+key holds an in-progress marker that expires after IDEMPOTENCY_LOCK_TTL
+seconds, so a worker killed mid-request blocks retries only briefly.
+"""
+
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+HEADER = "Idempotency-Key"
+
+# cache value while the first request with a key is still running
+_IN_PROGRESS = "in-progress"
+
+
+def stored_response(request):
+    """Return the cached entry for the request's key, or None.
+
+    The lookup is kept on the request, so the throttle check and the view
+    share a single cache read.
+    """
+    if not hasattr(request, "_idempotency_entry"):
+        key = _cache_key(request)
+        request._idempotency_entry = cache.get(key) if key else None
+    return request._idempotency_entry
+
+
+def idempotent(view_method):
+    """Replay stored responses for requests carrying an Idempotency-Key.
+
+    Put it outside ``transaction.atomic`` so a replay never opens a
+    transaction.
+    """
+
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = _cache_key(request)
+        if key is None:
+            return view_method(self, request, *args, **kwargs)
+
+        entry = stored_response(request)
+        if entry is None and not cache.add(key, _IN_PROGRESS, settings.IDEMPOTENCY_LOCK_TTL):
+            entry = cache.get(key)
+        if entry == _IN_PROGRESS:
+            return Response(
+                {"error": "A request with this Idempotency-Key is in progress"},
+                status=status.HTTP_409_CONFLICT,
+            )
+        if entry is not None:
+            response = Response(entry["data"], status=entry["status"])
+            response["Idempotent-Replayed"] = "true"
+            return response
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            cache.delete(key)
+            raise
+
+        if response.status_code >= 500:
+            cache.delete(key)
+        else:
+            cache.set(
+                key,
+                {"status": response.status_code, "data": response.data},
+                settings.IDEMPOTENCY_KEY_TTL,
+            )
+        return response
+
+    return wrapper
+
+
+def _cache_key(request):
+    value = request.headers.get(HEADER)
+    if not value or not request.user.is_authenticated:
+        return None
+    digest = hashlib.sha256(value.encode()).hexdigest()
+    return f"idempotency:{request.user.pk}:{request.path}:{digest}"
@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from events.feeds import FEED_HISTORY_DAYS
+from events.models import ArchivedTimeSlot, TimeSlot
+
+
+class Command(BaseCommand):
+    help = "Move timeslots that ended before a cutoff into the archive table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--before",
+            help="Cutoff date (YYYY-MM-DD); slots ending before it are archived. "
+            "Defaults to --days ago.",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=90,
+            help="Archive slots that ended more than this many days ago (default: 90, "
+            f"at least {FEED_HISTORY_DAYS})",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Slots moved per transaction (default: 500)",
+        )
+
+    def handle(self, *args, **options):
+        if options["before"]:
+            try:
+                cutoff = datetime.strptime(options["before"], "%Y-%m-%d")
+            except ValueError:
+                raise CommandError("--before must be a YYYY-MM-DD date")
+            cutoff = timezone.make_aware(cutoff, timezone.get_current_timezone())
+        else:
+            cutoff = timezone.now() - timedelta(days=options["days"])
+
+        now = timezone.now()
+        if cutoff > now:
+            raise CommandError("The cutoff must not be in the future")
+        # Feeds read only the live table, so archiving a slot they still show
+        # would drop it from calendars without bumping their versions.
+        if cutoff > now - timedelta(days=FEED_HISTORY_DAYS):
+            raise CommandError(
+                f"The cutoff must be at least {FEED_HISTORY_DAYS} days ago, "
+                "before the window served by the calendar feeds"
+            )
+
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be positive")
+
+        # SlotAvailability counts archived slots as well, so the summary rows
+        # for these days stay as they are.
+        # Each batch commits on its own, so an interrupted run keeps the work
+        # already done and a rerun carries on from the remaining slots.
+        total = 0
+        while True:
+            with transaction.atomic():
+                slots = list(
+                    TimeSlot.objects.select_for_update()
+                    .filter(end_time__lt=cutoff)
+                    .order_by("id")[:batch_size]
+                )
+                if not slots:
+                    break
+                ArchivedTimeSlot.objects.bulk_create(
+                    [ArchivedTimeSlot.from_slot(slot) for slot in slots],
+                    ignore_conflicts=True,
+                )
+                TimeSlot.objects.filter(id__in=[slot.id for slot in slots]).delete()
+            total += len(slots)
+            self.stdout.write(f"Archived {total} slots so far")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{total} timeslots ended before {cutoff:%Y-%m-%d} archived")
+        )
@@ -0,0 +1,77 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from events import outbox
+
+
+class Command(BaseCommand):
+    help = "Run queued booking side effects from the outbox table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=50,
+            help="Jobs claimed per batch (default: 50)",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=4,
+            help="Jobs run in parallel within a batch (default: 4)",
+        )
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=5,
+            help="Attempts before a job is marked failed (default: 5)",
+        )
+        parser.add_argument(
+            "--lease",
+            type=int,
+            default=300,
+            help="Seconds a dead worker's jobs wait before they are retried (default: 300)",
+        )
+        parser.add_argument(
+            "--keep-done",
+            type=int,
+            default=24,
+            help="Hours finished jobs are kept before they are deleted (default: 24)",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds to sleep when the queue is empty (default: 2)",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the jobs that are due and exit instead of polling",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--batch-size and --concurrency must be positive")
+        if options["lease"] < 1:
+            raise CommandError("--lease must be positive")
+
+        total = 0
+        while True:
+            processed = outbox.run_batch(
+                batch_size=options["batch_size"],
+                concurrency=options["concurrency"],
+                max_attempts=options["max_attempts"],
+                lease=timedelta(seconds=options["lease"]),
+            )
+            total += processed
+            if processed:
+                continue
+            outbox.prune(timedelta(hours=options["keep_done"]))
+            if options["once"]:
+                break
+            time.sleep(options["poll_interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"{total} outbox jobs processed"))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from events.models import SlotAvailability
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-day availability summary from the timeslots table"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rows = SlotAvailability.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"{len(rows)} availability rows rebuilt")
+        )
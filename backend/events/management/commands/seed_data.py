@@ -4,7 +4,7 @@ from django.contrib.auth.models import User
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 
-from events.models import EventCategory, TimeSlot
+from events.models import EventCategory, SlotAvailability, TimeSlot
 
 
 class Command(BaseCommand):
@@ -47,6 +47,7 @@ class Command(BaseCommand):
                 )
 
         TimeSlot.objects.bulk_create(slots)
+        SlotAvailability.rebuild()
         self.stdout.write(
             self.style.SUCCESS(f"{len(slots)} sample timeslots created for this week")
         )
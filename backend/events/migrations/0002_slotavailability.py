@@ -0,0 +1,32 @@
+# Generated by Django 4.2.28 on 2026-10-19 11:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotAvailability',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('free_count', models.PositiveIntegerField(default=0)),
+                ('booked_count', models.PositiveIntegerField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability', to='events.eventcategory')),
+            ],
+            options={
+                'verbose_name_plural': 'Slot availability',
+                'ordering': ['date', 'category'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='slotavailability',
+            constraint=models.UniqueConstraint(fields=('date', 'category'), name='unique_availability_per_day'),
+        ),
+    ]
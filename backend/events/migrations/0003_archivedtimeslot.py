@@ -0,0 +1,47 @@
+# Generated by Django 4.2.28 on 2026-10-19 11:45
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('events', '0002_slotavailability'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTimeSlot',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=200)),
+                ('start_time', models.DateTimeField()),
+                ('end_time', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['start_time'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='timeslot',
+            index=models.Index(fields=['start_time'], name='events_time_start_t_f8d05e_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedtimeslot',
+            name='booked_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_bookings', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='archivedtimeslot',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_timeslots', to='events.eventcategory'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedtimeslot',
+            index=models.Index(fields=['start_time'], name='events_arch_start_t_4c4166_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.28 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0004_outboxjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userpreference',
+            name='feed_secret',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
@@ -1,5 +1,10 @@
+from datetime import datetime, time, timedelta
+
 from django.db import models
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncDate
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 
 class EventCategory(models.Model):
@@ -39,12 +44,57 @@ class TimeSlot(models.Model):
 
     class Meta:
         ordering = ["start_time"]
+        indexes = [models.Index(fields=["start_time"])]
 
     def __str__(self):
         status = f"Booked by {self.booked_by}" if self.booked_by else "Available"
         return f"{self.title} ({self.category}) — {self.start_time:%Y-%m-%d %H:%M} [{status}]"
 
 
+class ArchivedTimeSlot(models.Model):
+    """A past TimeSlot moved out of the hot table by ``archive_timeslots``.
+
+    Keeps the original id so an interrupted archive run can be resumed
+    without duplicating rows.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    category = models.ForeignKey(
+        EventCategory,
+        on_delete=models.CASCADE,
+        related_name="archived_timeslots",
+    )
+    title = models.CharField(max_length=200)
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+    booked_by = models.ForeignKey(
+        User,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="archived_bookings",
+    )
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["start_time"]
+        indexes = [models.Index(fields=["start_time"])]
+
+    def __str__(self):
+        return f"{self.title} ({self.category}) — {self.start_time:%Y-%m-%d %H:%M} [Archived]"
+
+    @classmethod
+    def from_slot(cls, slot):
+        return cls(
+            id=slot.id,
+            category_id=slot.category_id,
+            title=slot.title,
+            start_time=slot.start_time,
+            end_time=slot.end_time,
+            booked_by_id=slot.booked_by_id,
+        )
+
+
 class UserPreference(models.Model):
     """Stores which event categories a user is interested in."""
 
@@ -54,6 +104,161 @@ class UserPreference(models.Model):
         related_name="preference",
     )
     categories = models.ManyToManyField(EventCategory, blank=True)
+    # signed into the iCalendar feed URLs; rotating it revokes old URLs
+    feed_secret = models.CharField(max_length=64, blank=True)
 
     def __str__(self):
         return f"Preferences for {self.user.username}"
+
+
+class SlotAvailability(models.Model):
+    """Free/booked slot counts per day and category.
+
+    Maintained incrementally by the create, book and unbook views (and
+    recounted by the Django admin) so that month/year overviews are a
+    single indexed read instead of a scan over TimeSlot. Rebuild with
+    ``manage.py rebuild_availability`` if it drifts.
+    """
+
+    date = models.DateField()
+    category = models.ForeignKey(
+        EventCategory,
+        on_delete=models.CASCADE,
+        related_name="availability",
+    )
+    free_count = models.PositiveIntegerField(default=0)
+    booked_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "Slot availability"
+        ordering = ["date", "category"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "category"], name="unique_availability_per_day"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.category}: {self.free_count} free / {self.booked_count} booked"
+
+    @classmethod
+    def adjust(cls, slot, free=0, booked=0):
+        """Shift the counters for *slot*'s day and category.
+
+        Call inside the transaction that changes the slot, after saving it.
+        The summary is derived data and must never block the booking: when
+        the row is missing, or has drifted so far that a counter would go
+        negative, it is recounted from the slots instead (which already
+        include the change).
+        """
+        day = timezone.localdate(slot.start_time)
+        updated = cls.objects.filter(
+            date=day,
+            category_id=slot.category_id,
+            free_count__gte=-free,
+            booked_count__gte=-booked,
+        ).update(
+            free_count=F("free_count") + free,
+            booked_count=F("booked_count") + booked,
+        )
+        if not updated:
+            cls.recount(day, slot.category_id)
+
+    @classmethod
+    def recount(cls, day, category_id):
+        """Set the row for *day* and *category_id* from a fresh count.
+
+        Concurrent recounts both insert, one insert is ignored, and the row
+        lock makes them count one after the other. Each count runs after the
+        lock is granted, so it sees the other's committed change.
+        """
+        cls.objects.bulk_create(
+            [cls(date=day, category_id=category_id)], ignore_conflicts=True
+        )
+        row = cls.objects.select_for_update().get(date=day, category_id=category_id)
+        start = timezone.make_aware(
+            datetime.combine(day, time.min), timezone.get_current_timezone()
+        )
+        row.free_count = row.booked_count = 0
+        # archived slots stay counted, as in rebuild()
+        for model in (TimeSlot, ArchivedTimeSlot):
+            counts = model.objects.filter(
+                category_id=category_id,
+                start_time__gte=start,
+                start_time__lt=start + timedelta(days=1),
+            ).aggregate(**_slot_counts())
+            row.free_count += counts["free"]
+            row.booked_count += counts["booked"]
+        row.save(update_fields=["free_count", "booked_count"])
+
+    @classmethod
+    def rebuild(cls):
+        """Recompute every row with one GROUP BY pass per slot table.
+
+        Archived slots are counted too, so archiving never changes the
+        summary and past months keep their overview.
+        """
+        totals = {}
+        for model in (TimeSlot, ArchivedTimeSlot):
+            rows = (
+                model.objects.order_by()
+                .annotate(day=TruncDate("start_time"))
+                .values("day", "category_id")
+                .annotate(**_slot_counts())
+            )
+            for row in rows:
+                key = (row["day"], row["category_id"])
+                free, booked = totals.get(key, (0, 0))
+                totals[key] = (free + row["free"], booked + row["booked"])
+
+        cls.objects.all().delete()
+        return cls.objects.bulk_create(
+            cls(date=day, category_id=category_id, free_count=free, booked_count=booked)
+            for (day, category_id), (free, booked) in totals.items()
+        )
+
+
+class OutboxJob(models.Model):
+    """A side effect queued by a booking transaction, run later by a worker.
+
+    Jobs are written in the same transaction as the change that caused them
+    (see events.outbox.enqueue) and drained by ``manage.py process_outbox``.
+    ``available_at`` is when a pending job may next run; while a job is
+    running it doubles as the lease expiry, after which another worker may
+    pick it up again, and for a done job it records when it finished.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    topic = models.CharField(max_length=100)
+    handler = models.CharField(max_length=200)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["available_at", "id"]
+        indexes = [models.Index(fields=["status", "available_at"])]
+
+    def __str__(self):
+        return f"{self.handler} for {self.topic} [{self.status}]"
+
+
+def _slot_counts():
+    """Aggregate expressions counting free and booked slots."""
+    return {
+        "free": Count("id", filter=Q(booked_by__isnull=True)),
+        "booked": Count("id", filter=Q(booked_by__isnull=False)),
+    }
@@ -0,0 +1,169 @@
+"""Transactional outbox for booking side effects.
+
+Side effects (emails, audit records, calendar invites...) register a handler
+for a topic::
+
+    from events import outbox
+
+    @outbox.register("slot.booked")
+    def send_confirmation(payload):
+        ...
+
+Views call ``enqueue`` inside their transaction, which writes one OutboxJob
+row per registered handler in a single INSERT. Handlers then run in
+``manage.py process_outbox``, outside the booking transaction and its row
+locks, so adding side effects doesn't slow booking down.
+"""
+
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import OutboxJob
+
+# topic -> {handler name: callable}
+_handlers = defaultdict(dict)
+
+
+def register(topic):
+    """Decorator registering *func* as a handler for *topic*."""
+
+    def decorator(func):
+        _handlers[topic][f"{func.__module__}.{func.__qualname__}"] = func
+        return func
+
+    return decorator
+
+
+def enqueue(topic, **payload):
+    """Queue a job for each handler of *topic*; call inside the transaction."""
+    jobs = [
+        OutboxJob(topic=topic, handler=name, payload=payload)
+        for name in _handlers.get(topic, ())
+    ]
+    return OutboxJob.objects.bulk_create(jobs)
+
+
+def claim(batch_size, lease, max_attempts):
+    """Mark up to *batch_size* due jobs as running and return them.
+
+    Jobs whose lease ran out (the worker died or hung) count as due again,
+    unless they already used *max_attempts*; those are marked failed here
+    and come back with that status so the caller can skip them. On
+    PostgreSQL, skip_locked lets several workers claim side by side.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            OutboxJob.objects.select_for_update(skip_locked=True).filter(
+                status__in=[OutboxJob.PENDING, OutboxJob.RUNNING],
+                available_at__lte=now,
+            )[:batch_size]
+        )
+        for job in jobs:
+            if job.status == OutboxJob.RUNNING and job.attempts >= max_attempts:
+                job.status = OutboxJob.FAILED
+                job.last_error = f"Lease expired on attempt {job.attempts}"
+                continue
+            job.status = OutboxJob.RUNNING
+            job.attempts += 1
+            job.available_at = now + lease
+        OutboxJob.objects.bulk_update(
+            jobs, ["status", "attempts", "available_at", "last_error"]
+        )
+    return jobs
+
+
+def run_batch(
+    batch_size=50,
+    concurrency=4,
+    max_attempts=5,
+    lease=timedelta(minutes=5),
+):
+    """Claim one batch and run it on at most *concurrency* threads.
+
+    While handlers run, the leases of the jobs still in flight are renewed
+    every third of *lease*, so a job is only claimed again once the worker
+    running it is gone. A handler that never returns holds its thread and
+    its job; handlers should put their own timeouts on network calls.
+    Failed jobs are retried with exponential backoff (30s, 60s, 120s...)
+    until *max_attempts*, then left as failed. Returns the number of jobs
+    claimed.
+    """
+    jobs = claim(batch_size, lease, max_attempts)
+    runnable = [job for job in jobs if job.status == OutboxJob.RUNNING]
+
+    renew_every = lease.total_seconds() / 3
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        running = {pool.submit(_run_job, job): job for job in runnable}
+        renewed_at = time.monotonic()
+        while running:
+            done, _ = wait(running, timeout=renew_every, return_when=FIRST_COMPLETED)
+            for future in done:
+                record_result(running.pop(future), future.result(), max_attempts)
+            if running and time.monotonic() - renewed_at >= renew_every:
+                renew(running.values(), lease)
+                renewed_at = time.monotonic()
+    return len(jobs)
+
+
+def renew(jobs, lease):
+    """Extend the lease of claimed *jobs* that are still being worked on."""
+    claimed = reduce(or_, (Q(id=job.id, attempts=job.attempts) for job in jobs))
+    return OutboxJob.objects.filter(claimed, status=OutboxJob.RUNNING).update(
+        available_at=timezone.now() + lease
+    )
+
+
+def record_result(job, error, max_attempts):
+    """Store the outcome of one run of a claimed *job*.
+
+    The update only applies while the job is still on the attempt this
+    worker claimed. If the lease expired and another worker took the job
+    over, this late result is dropped. A done job's ``available_at`` is
+    set to when it finished, which ``prune`` goes by.
+    """
+    fields = {"last_error": error or ""}
+    if error is None:
+        fields["status"] = OutboxJob.DONE
+        fields["available_at"] = timezone.now()
+    elif job.attempts >= max_attempts:
+        fields["status"] = OutboxJob.FAILED
+    else:
+        fields["status"] = OutboxJob.PENDING
+        fields["available_at"] = timezone.now() + timedelta(
+            seconds=30 * 2 ** (job.attempts - 1)
+        )
+    return OutboxJob.objects.filter(
+        id=job.id, status=OutboxJob.RUNNING, attempts=job.attempts
+    ).update(**fields)
+
+
+def prune(keep):
+    """Delete jobs that finished more than *keep* ago; failed jobs stay."""
+    deleted, _ = OutboxJob.objects.filter(
+        status=OutboxJob.DONE, available_at__lt=timezone.now() - keep
+    ).delete()
+    return deleted
+
+
+def _run_job(job):
+    """Run one job's handler, returning an error message or None."""
+    handler = _handlers.get(job.topic, {}).get(job.handler)
+    try:
+        if handler is None:
+            return f"No handler {job.handler} registered for {job.topic}"
+        handler(job.payload)
+    except Exception as exc:
+        return f"{type(exc).__name__}: {exc}"
+    finally:
+        # each handler thread opens its own connection if the handler used one
+        connection.close()
+    return None
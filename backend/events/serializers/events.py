@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from ..models import EventCategory, TimeSlot, UserPreference
+from ..models import ArchivedTimeSlot, EventCategory, SlotAvailability, TimeSlot, UserPreference
 
 class EventCategorySerializer(serializers.ModelSerializer):
     class Meta:
@@ -17,6 +17,17 @@ class TimeSlotSerializer(serializers.ModelSerializer):
             'start_time', 'end_time', 'booked_by', 'booked_by_username'
         )
 
+class ArchivedTimeSlotSerializer(serializers.ModelSerializer):
+    category_name = serializers.ReadOnlyField(source='category.name')
+    booked_by_username = serializers.ReadOnlyField(source='booked_by.username')
+
+    class Meta:
+        model = ArchivedTimeSlot
+        fields = (
+            'id', 'category', 'category_name', 'title', 'start_time',
+            'end_time', 'booked_by', 'booked_by_username', 'archived_at'
+        )
+
 class TimeSlotCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = TimeSlot
@@ -27,3 +38,11 @@ class UserPreferenceSerializer(serializers.ModelSerializer):
         model = UserPreference
         fields = ('id', 'user', 'categories')
         read_only_fields = ('user',)
+
+
+class SlotAvailabilitySerializer(serializers.ModelSerializer):
+    category_name = serializers.ReadOnlyField(source='category.name')
+
+    class Meta:
+        model = SlotAvailability
+        fields = ('date', 'category', 'category_name', 'free_count', 'booked_count')
@@ -1,15 +1,43 @@
+import json
+import math
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import Client, TestCase
+from django.utils import timezone
 from rest_framework.test import APIClient
 from rest_framework import status
 
-from ..models import EventCategory, TimeSlot, UserPreference
+from .. import feeds, outbox
+from ..throttling import BookingSlotThrottle, BookingUserThrottle
+from ..models import ArchivedTimeSlot, EventCategory, OutboxJob, SlotAvailability, TimeSlot, UserPreference
+from ..views.admin import ArchivePagination
 
 """
 Creating all test cases in a single file and seperating them in a class.
 I haven't created then in seperate file, hope this helps.
 """
 
+class CacheIsolationMixin:
+    """Start and end each test with an empty cache.
+
+    Throttle buckets, idempotency keys and feed versions live in the cache,
+    and pks repeat across tests, so leftovers would leak between them.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+
 class AuthTests(TestCase):
     """Tests for registration, login, and current-user endpoints."""
 
@@ -99,10 +127,11 @@ class PreferenceTests(TestCase):
         self.assertEqual(sorted(resp.data["categories"]), sorted([self.cat1.id, self.cat2.id]))
 
 
-class BookingTests(TestCase):
+class BookingTests(CacheIsolationMixin, TestCase):
     """Tests for booking and unbooking time slots."""
 
     def setUp(self):
+        super().setUp()
         self.client = APIClient()
         self.user = User.objects.create_user("testuser", password="pass123456")
         self.other_user = User.objects.create_user("otheruser", password="pass123456")
@@ -182,3 +211,553 @@ class AdminTests(TestCase):
         self.client.force_authenticate(user=self.user)
         resp = self.client.get("/api/admin/timeslots/")
         self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class TimeSlotRangeTests(TestCase):
+    """Tests for week and start/end range listing of time slots."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user("testuser", password="pass123456")
+        self.client.force_authenticate(user=self.user)
+        self.music = EventCategory.objects.create(name="Music")
+        self.sports = EventCategory.objects.create(name="Sports")
+        for start in ("2026-03-02T04:00:00Z", "2026-03-02T06:00:00Z", "2026-03-20T04:00:00Z"):
+            TimeSlot.objects.create(
+                category=self.music,
+                start_time=start,
+                end_time=start.replace("T04", "T05").replace("T06", "T07"),
+            )
+        TimeSlot.objects.create(
+            category=self.sports,
+            start_time="2026-03-03T04:00:00Z",
+            end_time="2026-03-03T05:00:00Z",
+        )
+
+    def _get_days(self, url):
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        return json.loads(b"".join(resp.streaming_content))
+
+    def test_week_listing(self):
+        resp = self.client.get("/api/timeslots/?week=2026-03-02")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(resp.data), 3)
+
+    def test_range_grouped_by_day(self):
+        days = self._get_days("/api/timeslots/?start=2026-03-01&end=2026-03-31")
+        self.assertEqual([d["date"] for d in days], ["2026-03-02", "2026-03-03", "2026-03-20"])
+        self.assertEqual(len(days[0]["slots"]), 2)
+
+    def test_range_scoped_to_preferences(self):
+        pref = UserPreference.objects.create(user=self.user)
+        pref.categories.add(self.sports)
+        days = self._get_days("/api/timeslots/?start=2026-03-01&end=2026-03-31")
+        self.assertEqual([d["date"] for d in days], ["2026-03-03"])
+
+    def test_range_rejected(self):
+        for query in (
+            "start=2026-02-01&end=2026-12-31",
+            "start=2026-03-31&end=2026-03-01",
+            "start=2026-02-30",
+            "start=2026-03-01&end=soon",
+        ):
+            resp = self.client.get(f"/api/timeslots/?{query}")
+            self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST, query)
+            self.assertIn("error", resp.data)
+
+    def test_range_at_limit(self):
+        days = self._get_days("/api/timeslots/?start=2026-02-20&end=2026-04-02")
+        self.assertEqual(len(days), 3)
+
+
+class AvailabilityTests(CacheIsolationMixin, TestCase):
+    """Tests for the per-day availability summary."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.admin = User.objects.create_superuser("admin", password="adminpass123")
+        self.user = User.objects.create_user("testuser", password="pass123456")
+        self.cat = EventCategory.objects.create(name="Music")
+
+    def _create_slot(self, start, end):
+        self.client.force_authenticate(user=self.admin)
+        self.client.post("/api/admin/timeslots/", {
+            "title": "Concert",
+            "category": self.cat.id,
+            "start_time": start,
+            "end_time": end,
+        })
+        self.client.force_authenticate(user=self.user)
+        return TimeSlot.objects.get(start_time=start)
+
+    def test_counts_follow_create_book_unbook(self):
+        slot = self._create_slot("2026-03-02T10:00:00Z", "2026-03-02T11:00:00Z")
+        self._create_slot("2026-03-02T12:00:00Z", "2026-03-02T13:00:00Z")
+        self.client.post(f"/api/book/{slot.id}/")
+
+        row = SlotAvailability.objects.get(category=self.cat)
+        self.assertEqual((row.free_count, row.booked_count), (1, 1))
+
+        self.client.post(f"/api/unbook/{slot.id}/")
+        row.refresh_from_db()
+        self.assertEqual((row.free_count, row.booked_count), (2, 0))
+
+    def test_seeds_missing_row_from_slots(self):
+        TimeSlot.objects.create(
+            category=self.cat,
+            start_time="2026-03-02T10:00:00Z",
+            end_time="2026-03-02T11:00:00Z",
+        )
+        slot = self._create_slot("2026-03-02T12:00:00Z", "2026-03-02T13:00:00Z")
+        SlotAvailability.objects.all().delete()
+        self.client.post(f"/api/book/{slot.id}/")
+
+        row = SlotAvailability.objects.get(category=self.cat)
+        self.assertEqual((row.free_count, row.booked_count), (1, 1))
+
+    def test_drifted_day_still_books(self):
+        first = self._create_slot("2026-03-02T10:00:00Z", "2026-03-02T11:00:00Z")
+        # added behind the summary's back, so the row says one free slot
+        second = TimeSlot.objects.create(
+            category=self.cat,
+            start_time="2026-03-02T12:00:00Z",
+            end_time="2026-03-02T13:00:00Z",
+        )
+        self.assertEqual(self.client.post(f"/api/book/{first.id}/").status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.post(f"/api/book/{second.id}/").status_code, status.HTTP_200_OK)
+
+        row = SlotAvailability.objects.get(category=self.cat)
+        self.assertEqual((row.free_count, row.booked_count), (0, 2))
+
+    def test_django_admin_keeps_summary_in_step(self):
+        client = Client()
+        client.force_login(self.admin)
+        resp = client.post("/admin/events/timeslot/add/", {
+            "category": self.cat.id,
+            "title": "Concert",
+            "start_time_0": "2026-03-02",
+            "start_time_1": "10:00:00",
+            "end_time_0": "2026-03-02",
+            "end_time_1": "11:00:00",
+        })
+        self.assertEqual(resp.status_code, 302)
+        row = SlotAvailability.objects.get(category=self.cat)
+        self.assertEqual((row.free_count, row.booked_count), (1, 0))
+
+        slot = TimeSlot.objects.get()
+        client.post(f"/admin/events/timeslot/{slot.id}/delete/", {"post": "yes"})
+        row.refresh_from_db()
+        self.assertEqual((row.free_count, row.booked_count), (0, 0))
+
+    def test_summary_range(self):
+        self._create_slot("2026-03-02T10:00:00Z", "2026-03-02T11:00:00Z")
+        self._create_slot("2026-04-15T10:00:00Z", "2026-04-15T11:00:00Z")
+        resp = self.client.get("/api/availability/?start=2026-03-01&end=2026-03-31")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(resp.data), 1)
+        self.assertEqual(resp.data[0]["date"], "2026-03-02")
+        self.assertEqual(resp.data[0]["free_count"], 1)
+
+    def test_summary_range_rejected(self):
+        self.client.force_authenticate(user=self.user)
+        for query in ("start=2026-01-01&end=2027-01-02", "start=2026-03-31&end=2026-03-01", "end=31-03"):
+            resp = self.client.get(f"/api/availability/?{query}")
+            self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST, query)
+
+    def test_rebuild_command(self):
+        TimeSlot.objects.create(
+            category=self.cat,
+            start_time="2026-03-02T10:00:00Z",
+            end_time="2026-03-02T11:00:00Z",
+            booked_by=self.user,
+        )
+        call_command("rebuild_availability", stdout=StringIO())
+        row = SlotAvailability.objects.get(category=self.cat)
+        self.assertEqual((row.free_count, row.booked_count), (0, 1))
+
+
+class ArchiveTests(TestCase):
+    """Tests for archiving past timeslots."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_superuser("admin", password="adminpass123")
+        self.cat = EventCategory.objects.create(name="Music")
+        for day in (1, 2, 3):
+            TimeSlot.objects.create(
+                category=self.cat,
+                title=f"Old {day}",
+                start_time=f"2025-01-0{day}T10:00:00Z",
+                end_time=f"2025-01-0{day}T11:00:00Z",
+                booked_by=self.admin if day == 1 else None,
+            )
+        self.current = TimeSlot.objects.create(
+            category=self.cat,
+            start_time="2026-03-02T10:00:00Z",
+            end_time="2026-03-02T11:00:00Z",
+        )
+
+    def test_archive_moves_old_slots_in_batches(self):
+        out = StringIO()
+        call_command("archive_timeslots", before="2026-01-01", batch_size=2, stdout=out)
+        self.assertEqual(list(TimeSlot.objects.values_list("id", flat=True)), [self.current.id])
+        self.assertEqual(ArchivedTimeSlot.objects.count(), 3)
+        self.assertEqual(ArchivedTimeSlot.objects.get(title="Old 1").booked_by, self.admin)
+        self.assertIn("Archived 2 slots so far", out.getvalue())
+
+    def test_archive_rerun_is_noop(self):
+        call_command("archive_timeslots", before="2026-01-01", stdout=StringIO())
+        call_command("archive_timeslots", before="2026-01-01", stdout=StringIO())
+        self.assertEqual(ArchivedTimeSlot.objects.count(), 3)
+        self.assertEqual(TimeSlot.objects.count(), 1)
+
+    def test_admin_list_archive(self):
+        call_command("archive_timeslots", before="2026-01-01", stdout=StringIO())
+        self.client.force_authenticate(user=self.admin)
+        resp = self.client.get("/api/admin/timeslots/archive/?start=2025-01-02")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual([s["title"] for s in resp.data["results"]], ["Old 2", "Old 3"])
+        self.assertIsNone(resp.data["next"])
+
+    def test_admin_archive_paginated(self):
+        call_command("archive_timeslots", before="2026-01-01", stdout=StringIO())
+        self.client.force_authenticate(user=self.admin)
+        with mock.patch.object(ArchivePagination, "page_size", 2):
+            resp = self.client.get("/api/admin/timeslots/archive/")
+            titles = [s["title"] for s in resp.data["results"]]
+            resp = self.client.get(resp.data["next"])
+            titles += [s["title"] for s in resp.data["results"]]
+        self.assertEqual(titles, ["Old 1", "Old 2", "Old 3"])
+
+    def test_archive_rejects_recent_cutoff(self):
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        last_week = timezone.localdate() - timedelta(days=7)
+        for options in ({"before": f"{tomorrow}"}, {"days": -1}, {"before": f"{last_week}"}, {"days": 7}):
+            with self.assertRaises(CommandError):
+                call_command("archive_timeslots", stdout=StringIO(), **options)
+        self.assertFalse(ArchivedTimeSlot.objects.exists())
+
+    def test_archive_keeps_availability_summary(self):
+        SlotAvailability.rebuild()
+        before = list(SlotAvailability.objects.values_list("date", "free_count", "booked_count"))
+        call_command("archive_timeslots", before="2026-01-01", stdout=StringIO())
+        call_command("rebuild_availability", stdout=StringIO())
+        after = list(SlotAvailability.objects.values_list("date", "free_count", "booked_count"))
+        self.assertEqual(after, before)
+
+
+class OutboxTests(CacheIsolationMixin, TestCase):
+    """Tests for queuing and draining booking side effects."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.user = User.objects.create_user("testuser", password="pass123456")
+        self.client.force_authenticate(user=self.user)
+        self.cat = EventCategory.objects.create(name="Music")
+        self.slot = TimeSlot.objects.create(
+            category=self.cat,
+            start_time="2026-02-20T10:00:00Z",
+            end_time="2026-02-20T11:00:00Z",
+        )
+        self.calls = []
+        patcher = mock.patch.dict(outbox._handlers, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_booking_enqueues_and_worker_runs_job(self):
+        outbox.register("slot.booked")(self.calls.append)
+        self.client.post(f"/api/book/{self.slot.id}/")
+
+        job = OutboxJob.objects.get()
+        self.assertEqual(job.payload, {"slot_id": self.slot.id, "user_id": self.user.id})
+        self.assertEqual(self.calls, [])
+
+        call_command("process_outbox", once=True, stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, OutboxJob.DONE)
+        self.assertEqual(self.calls, [job.payload])
+
+    def test_failing_job_retried_then_failed(self):
+        def broken(payload):
+            raise RuntimeError("smtp down")
+
+        outbox.register("slot.booked")(broken)
+        self.client.post(f"/api/book/{self.slot.id}/")
+
+        outbox.run_batch(max_attempts=2)
+        job = OutboxJob.objects.get()
+        self.assertEqual(job.status, OutboxJob.PENDING)
+        self.assertEqual(job.last_error, "RuntimeError: smtp down")
+        self.assertGreater(job.available_at, timezone.now())
+
+        OutboxJob.objects.update(available_at=timezone.now())
+        outbox.run_batch(max_attempts=2)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (OutboxJob.FAILED, 2))
+
+    def test_expired_lease_fails_after_max_attempts(self):
+        outbox.register("slot.booked")(self.calls.append)
+        self.client.post(f"/api/book/{self.slot.id}/")
+        # a worker claimed the last attempt and died without reporting
+        OutboxJob.objects.update(
+            status=OutboxJob.RUNNING, attempts=2, available_at=timezone.now()
+        )
+
+        outbox.run_batch(max_attempts=2)
+        job = OutboxJob.objects.get()
+        self.assertEqual((job.status, job.attempts), (OutboxJob.FAILED, 2))
+        self.assertEqual(self.calls, [])
+
+    def test_late_result_after_reclaim_is_dropped(self):
+        outbox.register("slot.booked")(self.calls.append)
+        self.client.post(f"/api/book/{self.slot.id}/")
+        [job] = outbox.claim(10, timedelta(minutes=5), max_attempts=5)
+        # the lease expired and another worker claimed the job again
+        OutboxJob.objects.update(attempts=job.attempts + 1)
+
+        self.assertEqual(outbox.record_result(job, None, max_attempts=5), 0)
+        self.assertEqual(OutboxJob.objects.get().status, OutboxJob.RUNNING)
+
+    def test_slow_handler_keeps_its_lease(self):
+        outbox.register("slot.booked")(lambda payload: time.sleep(0.3))
+        self.client.post(f"/api/book/{self.slot.id}/")
+
+        with mock.patch.object(outbox, "renew", wraps=outbox.renew) as renew:
+            outbox.run_batch(lease=timedelta(seconds=0.15))
+        renew.assert_called()
+        job = OutboxJob.objects.get()
+        self.assertEqual((job.status, job.attempts), (OutboxJob.DONE, 1))
+
+    def test_renew_skips_reclaimed_job(self):
+        outbox.register("slot.booked")(self.calls.append)
+        self.client.post(f"/api/book/{self.slot.id}/")
+        [job] = outbox.claim(10, timedelta(minutes=1), max_attempts=5)
+
+        self.assertEqual(outbox.renew([job], timedelta(minutes=5)), 1)
+        self.assertGreater(
+            OutboxJob.objects.get().available_at, timezone.now() + timedelta(minutes=4)
+        )
+        OutboxJob.objects.update(attempts=job.attempts + 1)
+        self.assertEqual(outbox.renew([job], timedelta(minutes=5)), 0)
+
+    def test_worker_prunes_old_done_jobs(self):
+        long_ago = timezone.now() - timedelta(days=2)
+        for status_, finished in (
+            (OutboxJob.DONE, long_ago),
+            (OutboxJob.DONE, timezone.now()),
+            (OutboxJob.FAILED, long_ago),
+        ):
+            OutboxJob.objects.create(
+                topic="slot.booked", handler="h", status=status_, available_at=finished
+            )
+
+        call_command("process_outbox", once=True, keep_done=24, stdout=StringIO())
+        self.assertEqual(
+            sorted(OutboxJob.objects.values_list("status", flat=True)),
+            [OutboxJob.DONE, OutboxJob.FAILED],
+        )
+        self.assertFalse(OutboxJob.objects.filter(available_at=long_ago, status=OutboxJob.DONE).exists())
+
+    def test_no_handlers_no_jobs(self):
+        self.client.post(f"/api/book/{self.slot.id}/")
+        self.assertFalse(OutboxJob.objects.exists())
+
+
+class FeedTests(CacheIsolationMixin, TestCase):
+    """Tests for the iCalendar booking and category feeds."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.user = User.objects.create_user("testuser", password="pass123456")
+        self.client.force_authenticate(user=self.user)
+        self.music = EventCategory.objects.create(name="Music")
+        self.sports = EventCategory.objects.create(name="Sports")
+        start = timezone.now() + timedelta(days=1)
+        self.slot = TimeSlot.objects.create(
+            category=self.music,
+            title="Concert",
+            start_time=start,
+            end_time=start + timedelta(hours=1),
+        )
+        TimeSlot.objects.create(
+            category=self.sports,
+            title="Match",
+            start_time=start,
+            end_time=start + timedelta(hours=1),
+        )
+        urls = self.client.get("/api/feeds/").data
+        self.bookings_url = urls["bookings"].replace("http://testserver", "")
+        self.categories_url = urls["categories"].replace("http://testserver", "")
+        self.feed_client = APIClient()
+
+    def test_bookings_feed_tracks_bookings(self):
+        resp = self.feed_client.get(self.bookings_url)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp["Content-Type"], "text/calendar; charset=utf-8")
+        self.assertNotIn(b"BEGIN:VEVENT", resp.content)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f"/api/book/{self.slot.id}/")
+        resp = self.feed_client.get(self.bookings_url)
+        self.assertIn(f"UID:timeslot-{self.slot.id}@event-booking".encode(), resp.content)
+
+    def test_conditional_get(self):
+        resp = self.feed_client.get(self.bookings_url)
+        etag = resp["ETag"]
+        self.assertIn("Last-Modified", resp)
+
+        resp = self.feed_client.get(self.bookings_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f"/api/book/{self.slot.id}/")
+        resp = self.feed_client.get(self.bookings_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+    def test_categories_feed_uses_preferences(self):
+        resp = self.feed_client.get(self.categories_url)
+        self.assertIn(b"SUMMARY:Concert", resp.content)
+        self.assertIn(b"SUMMARY:Match", resp.content)
+
+        pref = UserPreference.objects.get(user=self.user)
+        pref.categories.add(self.sports)
+        resp = self.feed_client.get(self.categories_url)
+        self.assertNotIn(b"SUMMARY:Concert", resp.content)
+        self.assertIn(b"SUMMARY:Match", resp.content)
+
+    def test_reset_revokes_old_urls(self):
+        resp = self.client.post("/api/feeds/")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        new_url = resp.data["bookings"].replace("http://testserver", "")
+        self.assertNotEqual(new_url, self.bookings_url)
+
+        resp = self.feed_client.get(self.bookings_url)
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+        resp = self.feed_client.get(new_url)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+    def test_etag_changes_when_window_moves(self):
+        etag = self.feed_client.get(self.bookings_url)["ETag"]
+        tomorrow = feeds._since() + timedelta(days=1)
+        with mock.patch.object(feeds, "_since", return_value=tomorrow):
+            resp = self.feed_client.get(self.bookings_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+    def test_last_modified_rounds_up(self):
+        version = time.time() + 100.25
+        self.assertEqual(feeds.last_modified(version).timestamp(), math.ceil(version))
+
+    def test_invalid_token(self):
+        resp = self.feed_client.get("/api/feeds/1:forged/bookings.ics")
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class BookingRetryTests(CacheIsolationMixin, TestCase):
+    """Tests for booking throttles and Idempotency-Key replays."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.user = User.objects.create_user("testuser", password="pass123456")
+        self.client.force_authenticate(user=self.user)
+        self.cat = EventCategory.objects.create(name="Music")
+        self.slot = TimeSlot.objects.create(
+            category=self.cat,
+            start_time="2026-02-20T10:00:00Z",
+            end_time="2026-02-20T11:00:00Z",
+        )
+
+    def test_idempotent_replay(self):
+        first = self.client.post(f"/api/book/{self.slot.id}/", HTTP_IDEMPOTENCY_KEY="abc")
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            replay = self.client.post(f"/api/book/{self.slot.id}/", HTTP_IDEMPOTENCY_KEY="abc")
+        self.assertEqual(replay.status_code, status.HTTP_200_OK)
+        self.assertEqual(replay.data, first.data)
+        self.assertEqual(replay["Idempotent-Replayed"], "true")
+
+        other = self.client.post(f"/api/book/{self.slot.id}/", HTTP_IDEMPOTENCY_KEY="def")
+        self.assertEqual(other.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_in_progress_marker_has_short_lease(self):
+        seen = {}
+
+        def timeouts(key, value, timeout=None, *args, **kwargs):
+            seen[value] = timeout
+            return real_add(key, value, timeout, *args, **kwargs)
+
+        real_add = cache.add
+        with mock.patch.object(cache, "add", side_effect=timeouts):
+            self.client.post(f"/api/book/{self.slot.id}/", HTTP_IDEMPOTENCY_KEY="abc")
+        self.assertEqual(seen["in-progress"], settings.IDEMPOTENCY_LOCK_TTL)
+        self.assertLess(settings.IDEMPOTENCY_LOCK_TTL, settings.IDEMPOTENCY_KEY_TTL)
+
+    def test_token_bucket_atomic_under_concurrency(self):
+        throttle = BookingSlotThrottle()
+        throttle.num_requests, throttle.duration = 5, 60
+        view = mock.Mock(kwargs={"slot_id": self.slot.id})
+        results = []
+        barrier = threading.Barrier(20)
+
+        def hit():
+            barrier.wait()
+            results.append(throttle.allow_request(None, view))
+
+        threads = [threading.Thread(target=hit) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results.count(True), 5)
+
+    def test_token_bucket_refills_one_token_per_interval(self):
+        throttle = BookingSlotThrottle()
+        throttle.num_requests, throttle.duration = 5, 60
+        view = mock.Mock(kwargs={"slot_id": self.slot.id})
+        now = 1000.0
+        throttle.timer = lambda: now
+
+        self.assertEqual([throttle.allow_request(None, view) for _ in range(6)], [True] * 5 + [False])
+        self.assertEqual(throttle.wait(), 12)
+
+        now += 12
+        self.assertEqual([throttle.allow_request(None, view) for _ in range(2)], [True, False])
+
+    def test_user_throttle(self):
+        rates = {"booking_user": "2/min", "booking_slot": "100/min"}
+        with mock.patch.object(BookingUserThrottle, "THROTTLE_RATES", rates), \
+                mock.patch.object(BookingSlotThrottle, "THROTTLE_RATES", rates):
+            codes = [self.client.post(f"/api/book/{self.slot.id}/").status_code for _ in range(3)]
+        self.assertEqual(codes[:2], [status.HTTP_200_OK, status.HTTP_400_BAD_REQUEST])
+        self.assertEqual(codes[2], status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_slot_throttle_shared_across_users(self):
+        other = APIClient()
+        other.force_authenticate(user=User.objects.create_user("other", password="pass123456"))
+        rates = {"booking_user": "100/min", "booking_slot": "1/min"}
+        with mock.patch.object(BookingUserThrottle, "THROTTLE_RATES", rates), \
+                mock.patch.object(BookingSlotThrottle, "THROTTLE_RATES", rates):
+            self.client.post(f"/api/book/{self.slot.id}/")
+            resp = other.post(f"/api/book/{self.slot.id}/")
+        self.assertEqual(resp.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", resp)
+
+
+class DatabaseProfileTests(TestCase):
+    """Tests for the SQLite connection tuning applied on connect."""
+
+    def test_sqlite_pragmas_applied(self):
+        from django.db import connection
+
+        if connection.vendor != "sqlite":
+            self.skipTest("SQLite profile only")
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertGreater(cursor.fetchone()[0], 0)
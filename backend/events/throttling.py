@@ -0,0 +1,77 @@
+import time
+
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """Token-bucket variant of DRF's SimpleRateThrottle.
+
+    A rate of "N/period" is a bucket of N tokens, so clients can burst up to
+    N requests. Tokens refill continuously at N per period, one every
+    period/N, rather than all at once when a window rolls over.
+
+    The bucket is one ``(tokens, timestamp)`` cache entry. Updating it is a
+    read-modify-write, so it is done under a short per-bucket lock taken
+    with ``cache.add``, which is atomic on every Django cache backend.
+    Without the lock, concurrent retries could spend the same token, which
+    is how they slip past DRF's history-list throttle.
+    """
+
+    # seconds the lock may be held before it expires (e.g. the worker died)
+    lock_timeout = 1
+    # seconds to wait for a busy lock before turning the request away
+    lock_wait = 0.5
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        lock = f"{self.key}_lock"
+        deadline = time.monotonic() + self.lock_wait
+        while not self.cache.add(lock, 1, self.lock_timeout):
+            if time.monotonic() > deadline:
+                self.wait_time = self.duration / self.num_requests
+                return False
+            time.sleep(0.001)
+
+        try:
+            now = self.timer()
+            tokens, stamp = self.cache.get(self.key, (self.num_requests, now))
+            tokens = min(
+                self.num_requests,
+                tokens + (now - stamp) * self.num_requests / self.duration,
+            )
+            if tokens < 1:
+                self.wait_time = (1 - tokens) * self.duration / self.num_requests
+                return False
+            self.cache.set(self.key, (tokens - 1, now), self.duration)
+            return True
+        finally:
+            self.cache.delete(lock)
+
+    def wait(self):
+        return self.wait_time
+
+
+class BookingUserThrottle(TokenBucketThrottle):
+    """Limits how often one user can book or unbook, across all slots."""
+
+    scope = "booking_user"
+
+    def get_cache_key(self, request, view):
+        if not request.user.is_authenticated:
+            return None
+        return self.cache_format % {"scope": self.scope, "ident": request.user.pk}
+
+
+class BookingSlotThrottle(TokenBucketThrottle):
+    """Limits booking traffic on one slot, across all users."""
+
+    scope = "booking_slot"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {"scope": self.scope, "ident": view.kwargs["slot_id"]}
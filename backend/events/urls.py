@@ -17,11 +17,25 @@ urlpatterns = [
     path("timeslots/", views.TimeSlotListView.as_view(), name="timeslot_list"),
     path("book/<int:slot_id>/", views.BookSlotView.as_view(), name="book_slot"),
     path("unbook/<int:slot_id>/", views.UnbookSlotView.as_view(), name="unbook_slot"),
+    path(
+        "availability/",
+        views.AvailabilitySummaryView.as_view(),
+        name="availability_summary",
+    ),
+    # calendar feeds
+    path("feeds/", views.FeedTokenView.as_view(), name="feed_urls"),
+    path("feeds/<str:token>/bookings.ics", views.bookings_feed, name="feed_bookings"),
+    path("feeds/<str:token>/categories.ics", views.categories_feed, name="feed_categories"),
     # admin
     path(
         "admin/timeslots/",
         views.AdminTimeSlotListCreateView.as_view(),
         name="admin_timeslots",
     ),
+    path(
+        "admin/timeslots/archive/",
+        views.AdminArchivedTimeSlotListView.as_view(),
+        name="admin_archived_timeslots",
+    ),
 ]
 # Class-Based Views (CBV)
\ No newline at end of file
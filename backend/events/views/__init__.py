@@ -1,5 +1,7 @@
-from .admin import AdminTimeSlotListCreateView
+from .admin import AdminArchivedTimeSlotListView, AdminTimeSlotListCreateView
+from .availability import AvailabilitySummaryView
 from .auth import RegisterView, current_user
 from .categories import CategoryListView
+from .feeds import FeedTokenView, bookings_feed, categories_feed
 from .preferences import PreferenceView
 from .timeslots import TimeSlotListView, BookSlotView, UnbookSlotView
@@ -1,7 +1,17 @@
+from datetime import timedelta
+
+from django.db import transaction
 from rest_framework import generics, permissions
+from rest_framework.pagination import CursorPagination
 
-from ..models import TimeSlot
-from ..serializers.events import TimeSlotSerializer, TimeSlotCreateSerializer
+from .. import feeds
+from ..models import ArchivedTimeSlot, SlotAvailability, TimeSlot
+from ..serializers.events import (
+    ArchivedTimeSlotSerializer,
+    TimeSlotSerializer,
+    TimeSlotCreateSerializer,
+)
+from .helpers import local_midnight, parse_iso_date
 
 
 class AdminTimeSlotListCreateView(generics.ListCreateAPIView):
@@ -14,3 +24,48 @@ class AdminTimeSlotListCreateView(generics.ListCreateAPIView):
         if self.request.method == "POST":
             return TimeSlotCreateSerializer
         return TimeSlotSerializer
+
+    @transaction.atomic
+    def perform_create(self, serializer):
+        slot = serializer.save()
+        SlotAvailability.adjust(slot, free=1)
+        feeds.touch(slot)
+
+
+class ArchivePagination(CursorPagination):
+    """Keyset pages over start_time, so deep pages stay as cheap as the first."""
+
+    ordering = "start_time"
+    page_size = 500
+
+
+class AdminArchivedTimeSlotListView(generics.ListAPIView):
+    """Admin: list archived (past) timeslots for reporting and export.
+
+    The archive only grows, so results are paginated: follow ``next`` until
+    it is null to export a range.
+
+    Query params:
+        start – Optional ISO date (YYYY-MM-DD), earliest start day included.
+        end   – Optional ISO date (YYYY-MM-DD), latest start day included.
+        category – Optional category id.
+    """
+
+    serializer_class = ArchivedTimeSlotSerializer
+    permission_classes = [permissions.IsAdminUser]
+    pagination_class = ArchivePagination
+
+    def get_queryset(self):
+        qs = ArchivedTimeSlot.objects.select_related("category", "booked_by")
+        params = self.request.query_params
+
+        start = parse_iso_date(params.get("start"))
+        if start:
+            qs = qs.filter(start_time__gte=local_midnight(start))
+        end = parse_iso_date(params.get("end"))
+        if end:
+            qs = qs.filter(start_time__lt=local_midnight(end + timedelta(days=1)))
+        if params.get("category"):
+            qs = qs.filter(category_id=params["category"])
+
+        return qs
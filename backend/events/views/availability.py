@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+
+from ..models import SlotAvailability
+from ..serializers.events import SlotAvailabilitySerializer
+from .helpers import parse_date_range, scope_to_preferences
+
+# Longest range served in one request (a year overview)
+MAX_RANGE_DAYS = 366
+
+
+class AvailabilitySummaryView(generics.ListAPIView):
+    """Free/booked slot counts per day and category, scoped to user preferences.
+
+    Reads the SlotAvailability aggregate, so a month or year overview is one
+    small indexed query rather than a walk over the timeslots.
+
+    Query params:
+        start – ISO date (YYYY-MM-DD), first day included.
+                Defaults to the first day of the current month.
+        end   – ISO date (YYYY-MM-DD), last day included. Defaults to the
+                end of start's month.
+        category – Optional category id to filter further.
+
+    An invalid range, or one longer than MAX_RANGE_DAYS, gets a 400.
+    """
+
+    serializer_class = SlotAvailabilitySerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def list(self, request, *args, **kwargs):
+        try:
+            self.date_range = parse_date_range(
+                request.query_params,
+                default_start=timezone.localdate().replace(day=1),
+                default_end=_month_end,
+                max_days=MAX_RANGE_DAYS,
+            )
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return super().list(request, *args, **kwargs)
+
+    def get_queryset(self):
+        start, end = self.date_range
+        qs = SlotAvailability.objects.filter(
+            date__gte=start,
+            date__lte=end,
+        ).select_related("category")
+
+        return scope_to_preferences(qs, self.request)
+
+
+# helpers
+
+def _month_end(day):
+    """Return the last day of the month containing *day*."""
+    first_of_next = (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return first_of_next - timedelta(days=1)
@@ -0,0 +1,99 @@
+from django.http import Http404, HttpResponse
+from django.urls import reverse
+from django.views.decorators.http import condition, require_GET
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .. import feeds
+from ..models import EventCategory, UserPreference
+
+
+class FeedTokenView(APIView):
+    """Return the current user's iCalendar subscription URLs.
+
+    POST issues new URLs and revokes the old ones (e.g. after a URL leaked).
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return Response(self._urls(request, feeds.make_token(request.user)))
+
+    def post(self, request):
+        return Response(self._urls(request, feeds.make_token(request.user, rotate=True)))
+
+    def _urls(self, request, token):
+        return {
+            "bookings": request.build_absolute_uri(
+                reverse("feed_bookings", args=[token])
+            ),
+            "categories": request.build_absolute_uri(
+                reverse("feed_categories", args=[token])
+            ),
+        }
+
+
+# The feeds are plain Django views: calendar apps authenticate with the
+# token in the URL, and @condition answers polls with 304 from the cached
+# change versions after a token check, before any slot query runs. Lookups
+# are kept on the request, since the ETag, Last-Modified and body all
+# need them.
+
+def _user_id(request, token):
+    if not hasattr(request, "_feed_user_id"):
+        request._feed_user_id = feeds.user_id_from_token(token)
+    if request._feed_user_id is None:
+        raise Http404("Unknown feed")
+    return request._feed_user_id
+
+
+def _category_versions(request, token):
+    """Change versions of the categories the token's user follows.
+
+    Like the timeslot listing, no preferences means every category.
+    """
+    if not hasattr(request, "_feed_versions"):
+        category_ids = list(
+            UserPreference.categories.through.objects.filter(
+                userpreference__user_id=_user_id(request, token)
+            ).values_list("eventcategory_id", flat=True)
+        )
+        if not category_ids:
+            category_ids = list(EventCategory.objects.values_list("id", flat=True))
+        request._feed_versions = feeds.category_versions(category_ids)
+    return request._feed_versions
+
+
+def _bookings_etag(request, token):
+    return feeds.etag_for(feeds.user_version(_user_id(request, token)))
+
+
+def _bookings_last_modified(request, token):
+    return feeds.last_modified(feeds.user_version(_user_id(request, token)))
+
+
+def _categories_etag(request, token):
+    return feeds.etag_for(*sorted(_category_versions(request, token).items()))
+
+
+def _categories_last_modified(request, token):
+    return feeds.last_modified(*_category_versions(request, token).values())
+
+
+def _ics_response(body):
+    return HttpResponse(body, content_type="text/calendar; charset=utf-8")
+
+
+@require_GET
+@condition(etag_func=_bookings_etag, last_modified_func=_bookings_last_modified)
+def bookings_feed(request, token):
+    """iCalendar feed of the slots the token's user has booked."""
+    return _ics_response(feeds.bookings_calendar(_user_id(request, token)))
+
+
+@require_GET
+@condition(etag_func=_categories_etag, last_modified_func=_categories_last_modified)
+def categories_feed(request, token):
+    """iCalendar feed of all slots in the token's user's preferred categories."""
+    return _ics_response(feeds.categories_calendar(_category_versions(request, token)))
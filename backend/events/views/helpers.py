@@ -0,0 +1,71 @@
+"""Query-param parsing and scoping shared by the API views."""
+
+from datetime import datetime, time
+
+from django.utils import timezone
+
+from ..models import UserPreference
+
+
+def parse_iso_date(value):
+    """Parse a YYYY-MM-DD string, returning None when missing or invalid."""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def local_midnight(day):
+    """Return the aware datetime at which *day* starts in the current timezone.
+
+    Filtering on these bounds, rather than ``start_time__date``, keeps the
+    start_time index usable.
+    """
+    return timezone.make_aware(
+        datetime.combine(day, time.min), timezone.get_current_timezone()
+    )
+
+
+def scope_to_preferences(qs, request):
+    """Filter *qs* by the ``category`` param, else by the user's preferences.
+
+    Preferences are read with a single query on the M2M table; a user with
+    no preferred categories sees everything.
+    """
+    category_id = request.query_params.get("category")
+    if category_id:
+        return qs.filter(category_id=category_id)
+
+    preferred = list(
+        UserPreference.categories.through.objects.filter(
+            userpreference__user=request.user
+        ).values_list("eventcategory_id", flat=True)
+    )
+    if preferred:
+        qs = qs.filter(category_id__in=preferred)
+    return qs
+
+
+def parse_date_range(params, default_start, default_end, max_days):
+    """Return the (start, end) dates given by the ``start`` and ``end`` params.
+
+    A missing start falls back to *default_start*, a missing end to
+    ``default_end(start)``; both days are included. Raises ValueError, with
+    a message for the client, when a date is invalid, end is before start,
+    or the range spans more than *max_days*.
+    """
+    dates = {}
+    for name, default in (("start", default_start), ("end", None)):
+        value = params.get(name)
+        dates[name] = parse_iso_date(value) if value else default
+        if value and dates[name] is None:
+            raise ValueError(f"{name} must be a YYYY-MM-DD date")
+
+    start, end = dates["start"], dates["end"] or default_end(dates["start"])
+    if end < start:
+        raise ValueError("end must not be before start")
+    if (end - start).days >= max_days:
+        raise ValueError(f"Ranges are limited to {max_days} days")
+    return start, end
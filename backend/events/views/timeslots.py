@@ -1,65 +1,112 @@
 from datetime import timedelta, datetime
+from itertools import groupby
 
 from django.db import transaction
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 from rest_framework.views import APIView
 
-from ..models import TimeSlot, UserPreference
+from .. import feeds, idempotency, outbox
+from ..models import SlotAvailability, TimeSlot
 from ..serializers.events import TimeSlotSerializer
+from ..throttling import BookingSlotThrottle, BookingUserThrottle
+from .helpers import local_midnight, parse_date_range, scope_to_preferences
+
+# Longest date range served by one range request (six calendar weeks)
+MAX_RANGE_DAYS = 42
 
 
 class TimeSlotListView(generics.ListAPIView):
-    """List time slots for a given week, scoped to user preferences.
+    """List time slots for a week or a date range, scoped to user preferences.
 
     Query params:
         week  – ISO date string (YYYY-MM-DD) for the Monday of the week.
                 Defaults to the current week.
+        start – ISO date (YYYY-MM-DD), first day of a range. When given the
+                response is streamed as ``[{"date": ..., "slots": [...]}]``,
+                one entry per day that has slots, from a single query.
+        end   – ISO date (YYYY-MM-DD), last day of the range (included).
+                Defaults to start + 6 days.
         category – Optional category id to filter further.
+
+    An invalid range, or one longer than MAX_RANGE_DAYS, gets a 400.
     """
 
     serializer_class = TimeSlotSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
+        range_start, range_end = self._get_range()
+
+        qs = TimeSlot.objects.filter(
+            start_time__gte=range_start,
+            start_time__lt=range_end,
+        ).select_related("category", "booked_by")
+
+        return scope_to_preferences(qs, self.request)
+
+    def list(self, request, *args, **kwargs):
+        if not request.query_params.get("start"):
+            return super().list(request, *args, **kwargs)
+
+        try:
+            self.date_range = parse_date_range(
+                request.query_params,
+                default_start=None,
+                default_end=lambda start: start + timedelta(days=6),
+                max_days=MAX_RANGE_DAYS,
+            )
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        slots = self.get_queryset().order_by("start_time").iterator()
+        return StreamingHttpResponse(
+            _stream_days(slots), content_type="application/json"
+        )
+
+    def _get_range(self):
+        """Return the [start, end) datetimes requested by the query params."""
+        tz = timezone.get_current_timezone()
+
+        if self.request.query_params.get("start"):
+            start, end = self.date_range
+            return local_midnight(start), local_midnight(end + timedelta(days=1))
+
         week_str = self.request.query_params.get("week")
         if week_str:
             try:
                 week_start = datetime.strptime(week_str, "%Y-%m-%d")
-                week_start = timezone.make_aware(
-                    week_start, timezone.get_current_timezone()
-                )
+                week_start = timezone.make_aware(week_start, tz)
             except ValueError:
                 week_start = _monday_of(timezone.now())
         else:
             week_start = _monday_of(timezone.now())
 
-        week_end = week_start + timedelta(days=7)
+        return week_start, week_start + timedelta(days=7)
 
-        qs = TimeSlot.objects.filter(
-            start_time__gte=week_start,
-            start_time__lt=week_end,
-        ).select_related("category", "booked_by")
 
-        # Optional category filter
-        category_id = self.request.query_params.get("category")
-        if category_id:
-            qs = qs.filter(category_id=category_id)
-        else:
-            # Scope to user preferences if no explicit filter
-            pref = UserPreference.objects.filter(user=self.request.user).first()
-            if pref and pref.categories.exists():
-                qs = qs.filter(category__in=pref.categories.all())
+class BookingBaseView(APIView):
+    """Shared setup for the book/unbook endpoints.
 
-        return qs
+    Both are throttled per user and per slot, and accept an Idempotency-Key
+    header. Replays of a stored response skip the throttles as well.
+    """
 
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [BookingUserThrottle, BookingSlotThrottle]
 
-class BookSlotView(APIView):
-    """Book a time slot for the current user."""
+    def check_throttles(self, request):
+        if idempotency.stored_response(request) is None:
+            super().check_throttles(request)
 
-    permission_classes = [permissions.IsAuthenticated]
 
+class BookSlotView(BookingBaseView):
+    """Book a time slot for the current user."""
+
+    @idempotency.idempotent
     @transaction.atomic
     def post(self, request, slot_id):
         try:
@@ -77,14 +124,16 @@ class BookSlotView(APIView):
 
         slot.booked_by = request.user
         slot.save()
+        SlotAvailability.adjust(slot, free=-1, booked=1)
+        outbox.enqueue("slot.booked", slot_id=slot.id, user_id=request.user.id)
+        feeds.touch(slot, request.user.id)
         return Response(TimeSlotSerializer(slot).data)
 
 
-class UnbookSlotView(APIView):
+class UnbookSlotView(BookingBaseView):
     """Cancel a booking — only the user who booked it can cancel."""
 
-    permission_classes = [permissions.IsAuthenticated]
-
+    @idempotency.idempotent
     @transaction.atomic
     def post(self, request, slot_id):
         try:
@@ -102,6 +151,9 @@ class UnbookSlotView(APIView):
 
         slot.booked_by = None
         slot.save()
+        SlotAvailability.adjust(slot, free=1, booked=-1)
+        outbox.enqueue("slot.unbooked", slot_id=slot.id, user_id=request.user.id)
+        feeds.touch(slot, request.user.id)
         return Response(TimeSlotSerializer(slot).data)
 
 
@@ -111,3 +163,17 @@ def _monday_of(dt):
     """Return midnight of the Monday of the week containing *dt*."""
     monday = dt - timedelta(days=dt.weekday())
     return monday.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _stream_days(slots):
+    """Yield a JSON array of ``{"date", "slots"}`` objects, one day at a time.
+
+    *slots* must be ordered by start_time.
+    """
+    encoder = JSONEncoder()
+    yield "["
+    days = groupby(slots, key=lambda slot: timezone.localdate(slot.start_time))
+    for i, (day, day_slots) in enumerate(days):
+        data = {"date": day, "slots": TimeSlotSerializer(day_slots, many=True).data}
+        yield ("," if i else "") + encoder.encode(data)
+    yield "]"
@@ -0,0 +1,140 @@
+"""Booking contention benchmark.
+
+Runs THREADS concurrent clients against a throwaway SQLite file. Each client
+walks every slot ROUNDS times, booking it and, when that succeeds,
+unbooking it again. Every POST is counted by endpoint and outcome:
+
+    ok        200
+    conflict  400/403 (slot already booked / booked by someone else)
+    locked    "database is locked" raised by SQLite
+    other     anything else
+
+Usage (from backend/):
+
+    python scripts/bench_booking.py --threads 16
+    python scripts/bench_booking.py --threads 16 --stock   # pre-tuning baseline
+
+--stock swaps in Django's stock sqlite3 backend with per-request connections,
+i.e. the database setup before the tuned profile. Booking throttles are
+disabled so only database contention is measured.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--slots", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--stock", action="store_true", help="untuned SQLite backend")
+    args = parser.parse_args()
+
+    django.setup()
+    from django.conf import settings
+
+    db_dir = tempfile.mkdtemp(prefix="bench_booking_")
+    settings.DATABASES["default"]["NAME"] = os.path.join(db_dir, "bench.sqlite3")
+    if args.stock:
+        settings.DATABASES["default"].update(
+            ENGINE="django.db.backends.sqlite3", CONN_MAX_AGE=0, OPTIONS={}
+        )
+    settings.ALLOWED_HOSTS = ["testserver"]
+
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from django.db import connections
+    from django.utils import timezone
+    from rest_framework.test import APIClient
+
+    from events.models import EventCategory, TimeSlot
+    from events.views.timeslots import BookingBaseView
+
+    BookingBaseView.throttle_classes = []
+    # failed requests are counted below, not logged one traceback at a time
+    logging.getLogger("django.request").setLevel(logging.CRITICAL)
+    call_command("migrate", verbosity=0)
+
+    cat = EventCategory.objects.create(name="Bench")
+    now = timezone.now()
+    TimeSlot.objects.bulk_create(
+        TimeSlot(
+            category=cat,
+            start_time=now + timedelta(hours=i),
+            end_time=now + timedelta(hours=i + 1),
+        )
+        for i in range(args.slots)
+    )
+    slot_ids = list(TimeSlot.objects.values_list("id", flat=True))
+    users = [User.objects.create_user(f"bench{i}") for i in range(args.threads)]
+    connections.close_all()
+
+    outcomes = Counter()
+    latencies = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(args.threads)
+
+    def post(client, url):
+        started = time.perf_counter()
+        try:
+            code = client.post(url).status_code
+            outcome = {200: "ok", 400: "conflict", 403: "conflict"}.get(code, "other")
+        except Exception as exc:
+            outcome = "locked" if "database is locked" in str(exc) else "other"
+        return outcome, time.perf_counter() - started
+
+    def worker(user):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        barrier.wait()
+        for _ in range(args.rounds):
+            for slot_id in slot_ids:
+                outcome, elapsed = post(client, f"/api/book/{slot_id}/")
+                results = [("book", outcome, elapsed)]
+                if outcome == "ok":
+                    results.append(("unbook", *post(client, f"/api/unbook/{slot_id}/")))
+                with lock:
+                    for endpoint, result, seconds in results:
+                        outcomes[endpoint, result] += 1
+                        latencies.append(seconds)
+        connections.close_all()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(user,)) for user in users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    profile = "stock" if args.stock else "tuned"
+    print(f"profile={profile} threads={args.threads} requests={len(latencies)} wall={wall:.2f}s")
+    for endpoint in ("book", "unbook"):
+        counts = " ".join(
+            f"{outcome}={outcomes[endpoint, outcome]}"
+            for outcome in ("ok", "conflict", "locked", "other")
+        )
+        print(f"  {endpoint:<7}{counts}")
+    print(
+        f"  p50={latencies[len(latencies) // 2] * 1000:.1f}ms "
+        f"p99={latencies[int(len(latencies) * 0.99)] * 1000:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()